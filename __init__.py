@@ -30,10 +30,12 @@ bl_info = {
 }
 
 import bpy
+import bmesh
+import math
 import numpy
-import mathutils
 from bpy_extras import view3d_utils
 from gpu_extras.presets import draw_circle_2d
+from mathutils.bvhtree import BVHTree
 
 #   .oooooo.    oooo             .o8                 oooo       oooooo     oooo
 #  d8P'  `Y8b   `888            '888                 `888        `888.     .8'
@@ -45,7 +47,12 @@ from gpu_extras.presets import draw_circle_2d
 
 circle = None
 circle_pos = (0, 0)
-tri_obj = None
+circle_size = None
+tri_bvh = None
+tri_verts = None
+tri_uvs = None
+tri_matrix = None
+tri_matrix_inv = None
 pressing = False
 mode = None
 
@@ -58,58 +65,176 @@ mode = None
 # o888o         `V88V'V8P' o888o o888o `Y8bod8P'   '888' o888o `Y8bod8P' o888o o888o
 
 
-def lerp(mix, a, b):
-    """linear interpolation"""
+def dir_color3(ax, ay, az, bx, by, bz):
+    """normalized direction from b to a, mapped into the color range | None, if both are the same"""
 
-    return (b - a) * mix + a
+    dx = ax - bx
+    dy = ay - by
+    dz = az - bz
+    norm_factor = math.sqrt(dx * dx + dy * dy + dz * dz)
+    if norm_factor == 0:
+        return None
+
+    # map the range to the color range, so 0.5 ist the middle
+    inv = 0.5 / norm_factor
+    return (dx * inv + 0.5, dy * inv + 0.5, dz * inv + 0.5)
+
+
+def dir_color2(ax, ay, bx, by):
+    """2D version of dir_color3, the blue channel stays 0"""
+
+    dx = ax - bx
+    dy = ay - by
+    norm_factor = math.hypot(dx, dy)
+    if norm_factor == 0:
+        return None
+
+    # map the range to the color range, so 0.5 ist the middle
+    inv = 0.5 / norm_factor
+    return (dx * inv + 0.5, dy * inv + 0.5, 0.0)
+
+
+def barycentric_uv(v0, v1, v2, uv0, uv1, uv2, p):
+    """uv coordinates of the point p inside the triangle v0 v1 v2 with the uvs uv0 uv1 uv2
+    plain scalar math, for 3 component vectors this is faster than any numpy call | None, if degenerated"""
+
+    # barycentric weights of p inside the triangle
+    e1x, e1y, e1z = v1[0] - v0[0], v1[1] - v0[1], v1[2] - v0[2]
+    e2x, e2y, e2z = v2[0] - v0[0], v2[1] - v0[1], v2[2] - v0[2]
+    px, py, pz = p[0] - v0[0], p[1] - v0[1], p[2] - v0[2]
+    d00 = e1x * e1x + e1y * e1y + e1z * e1z
+    d01 = e1x * e2x + e1y * e2y + e1z * e2z
+    d11 = e2x * e2x + e2y * e2y + e2z * e2z
+    d20 = px * e1x + py * e1y + pz * e1z
+    d21 = px * e2x + py * e2y + pz * e2z
+    denom = d00 * d11 - d01 * d01
+    if denom == 0:
+        return None
+
+    v = (d11 * d20 - d01 * d21) / denom
+    w = (d00 * d21 - d01 * d20) / denom
+    u = 1 - v - w
+
+    return (u * uv0[0] + v * uv1[0] + w * uv2[0], u * uv0[1] + v * uv1[1] + w * uv2[1])
+
+
+def substep_positions(prev_position, position, substeps):
+    """positions of all substep dots from prev_position towards position (ending on it), in one vectorized lerp
+    they are painted as one stroke, so they have to follow the mouse direction
+    returned as a list of plain float pairs, so the stroke entries dont carry numpy scalars"""
+
+    prev_position = numpy.asarray(prev_position, dtype=numpy.float32)
+    mixes = numpy.arange(1, substeps + 1, dtype=numpy.float32) / substeps
+    positions = prev_position + mixes[:, None] * (numpy.asarray(position, dtype=numpy.float32) - prev_position)
+    return positions.tolist()
 
 
-def remove_temp_obj():
-    """removes the temp object and data if it exists"""
+def remove_temp_mesh():
+    """removes the temp mesh data if it exists"""
 
     if bpy.data.meshes.get("FLOWMAP_temp_mesh"):
         bpy.data.meshes.remove(bpy.data.meshes["FLOWMAP_temp_mesh"])
-    if bpy.data.objects.get("FLOWMAP_temp_obj"):
-        bpy.data.objects.remove(bpy.data.objects["FLOWMAP_temp_obj"])
+    return None
+
+
+def remove_paint_cache():
+    """frees the ray cast tree, triangle arrays and matrices cached by triangulate_object"""
+
+    global tri_bvh
+    global tri_verts
+    global tri_uvs
+    global tri_matrix
+    global tri_matrix_inv
+
+    tri_bvh = None
+    tri_verts = None
+    tri_uvs = None
+    tri_matrix = None
+    tri_matrix_inv = None
     return None
 
 
 def triangulate_object(obj):
-    """triangulate incoming object and return it as a temporary copy"""
+    """triangulate incoming object and cache its ray cast tree, triangle arrays and matrices for painting"""
+
+    global tri_bvh
 
     template_ob = obj
 
     # first remove temp stuff, if it exists already
-    remove_temp_obj()
+    remove_temp_mesh()
+
+    # triangulate the evaluated mesh (so modifiers are still taken into account) in a bmesh
+    # instead of linking a modified copy, which would need a new depsgraph evaluation
+    bm = bmesh.new()
+    bm.from_object(template_ob, bpy.context.evaluated_depsgraph_get())
+    bmesh.ops.triangulate(bm, faces=bm.faces)
+    mesh = bpy.data.meshes.new("FLOWMAP_temp_mesh")
+    bm.to_mesh(mesh)
+
+    # build the ray cast acceleration once | its face indices are the same as the ones of the mesh
+    tri_bvh = BVHTree.FromBMesh(bm)
+    bm.free()
+
+    # the mesh is only needed for foreach_get, so it is removed again right away
+    store_mesh_arrays(mesh)
+    bpy.data.meshes.remove(mesh)
+    update_matrix_cache(template_ob)
+
+    return None
+
+
+def update_matrix_cache(obj):
+    """cache the world matrix of the painted object and its inverse | only inverted again, if the object moved"""
+
+    global tri_matrix
+    global tri_matrix_inv
+
+    if tri_matrix is None or obj.matrix_world != tri_matrix:
+        tri_matrix = obj.matrix_world.copy()
+        tri_matrix_inv = tri_matrix.inverted()
+
+    return None
 
-    ob = template_ob.copy()
-    ob.data = ob.data.copy()
-    ob.modifiers.new("triangulate", 'TRIANGULATE')
 
-    # need to be in scnene, for depsgraph to work apparently
-    bpy.context.collection.objects.link(ob)
+def store_mesh_arrays(mesh):
+    """bulk copy vertices and uvs of the triangulated mesh into per triangle numpy arrays (no RNA access per hit)
+    tri_verts is (triangles, 3, 3) and tri_uvs is (triangles, 3, 2), both indexed by the ray cast face index"""
 
-    depsgraph = bpy.context.evaluated_depsgraph_get()
-    object_eval = ob.evaluated_get(depsgraph)
-    mesh_from_eval = bpy.data.meshes.new_from_object(object_eval)
-    ob.data = mesh_from_eval
+    global tri_verts
+    global tri_uvs
 
-    new_ob = bpy.data.objects.new(name="FLOWMAP_temp_obj", object_data=mesh_from_eval)
-    bpy.context.collection.objects.link(new_ob)
-    new_ob.matrix_world = template_ob.matrix_world
+    vert_count = len(mesh.vertices)
+    loop_count = len(mesh.loops)
+    tri_count = len(mesh.polygons)
 
-    # remove the depsgraph object
-    bpy.data.objects.remove(ob, do_unlink=True)
+    vert_cos = numpy.empty(vert_count * 3, dtype=numpy.float32)
+    mesh.vertices.foreach_get("co", vert_cos)
+    vert_cos = vert_cos.reshape((vert_count, 3))
 
-    # hide temp obj
-    # new_ob.hide_viewport = True
-    new_ob.hide_set(True)
+    loop_vert_indices = numpy.empty(loop_count, dtype=numpy.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vert_indices)
 
-    return new_ob
+    # every polygon is a triangle, so its loops are loop_start + 0, 1, 2
+    loop_starts = numpy.empty(tri_count, dtype=numpy.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    tri_loops = loop_starts[:, None] + numpy.array([0, 1, 2], dtype=numpy.int32)
 
+    tri_verts = numpy.ascontiguousarray(vert_cos[loop_vert_indices[tri_loops]])
 
-def obj_ray_cast(context, area_pos, obj, matrix):
-    """Wrapper for ray casting that moves the ray into object space"""
+    # uv"s are stored in loops | there might be no uv map at all (object and world space dont need one)
+    if mesh.uv_layers.active is not None:
+        loop_uvs = numpy.empty(loop_count * 2, dtype=numpy.float32)
+        mesh.uv_layers.active.data.foreach_get("uv", loop_uvs)
+        tri_uvs = numpy.ascontiguousarray(loop_uvs.reshape((loop_count, 2))[tri_loops])
+    else:
+        tri_uvs = None
+
+    return None
+
+
+def obj_ray_cast(context, area_pos, bvh, matrix_inv):
+    """Wrapper for ray casting that moves the ray into object space and casts it against the given BVHTree"""
 
     # get the context arguments
     scene = context.scene
@@ -124,208 +249,192 @@ def obj_ray_cast(context, area_pos, obj, matrix):
     ray_target = ray_origin + view_vector
 
     # get the ray relative to the object
-    matrix_inv = matrix.inverted()
     ray_origin_obj = matrix_inv @ ray_origin
     ray_target_obj = matrix_inv @ ray_target
     ray_direction_obj = ray_target_obj - ray_origin_obj
 
     # cast the ray
-    success, location, normal, face_index = obj.ray_cast(
-        origin=ray_origin_obj, direction=ray_direction_obj, distance=bpy.context.scene.flowmap_trace_distance
-    )
+    location, normal, face_index, _ = bvh.ray_cast(ray_origin_obj, ray_direction_obj, scene.flowmap_trace_distance)
 
-    if success:
+    if location is not None:
         return location, normal, face_index
     return None, None, None
 
 
 def line_trace_for_pos(context, area_pos):
     """Trace at given position. Return hit in obje and world space."""
-    global tri_obj
     obj = bpy.context.active_object
-    matrix = obj.matrix_world.copy()
     hit_world = None
     if obj.type == 'MESH':
-        hit, normal, face_index = obj_ray_cast(context=context, area_pos=area_pos, obj=tri_obj, matrix=matrix)
+        hit, normal, face_index = obj_ray_cast(
+            context=context, area_pos=area_pos, bvh=tri_bvh, matrix_inv=tri_matrix_inv
+        )
         if hit is not None:
-            hit_world = matrix @ hit
+            hit_world = tri_matrix @ hit
             return hit, hit_world
         else:
             return None, None
 
 
-def get_uv_space_direction_color(context, area_pos, area_prev_pos):
-    """combine area_pos and previouse linetrace into direction color"""
+def get_uv_space_direction_color(context, area_pos, area_prev_pos, prev_trace=None):
+    """combine area_pos and previouse linetrace into direction color | prev_trace is the trace of the last call"""
 
     def line_trace_for_uv(context, area_pos):
         """line trace into the scene, to find uv coordinates at the brush location at the object """
 
-        def pos_to_uv_co(obj, matrix_world, world_pos, face_index):
+        def pos_to_uv_co(obj_pos, face_index):
             """translate 3D postion on a mesh into uv coordinates"""
 
-            face_verts = []
-            uv_verts = []
-
-            # uv"s are stored in loops
-            face = obj.data.polygons[face_index]
-            for vert_idx, loop_idx in zip(face.vertices, face.loop_indices):
-                uv_coords = obj.data.uv_layers.active.data[loop_idx].uv
-
-                face_verts.append(matrix_world @ obj.data.vertices[vert_idx].co)
-                uv_verts.append(uv_coords.to_3d())
-
-                # print(f'face idx {face.index}, vert idx {vert_idx}, vert coords {ob.data.vertices[vert_idx].co},uv coords {uv_coords.x} {uv_coords.y}')
+            if tri_uvs is None:
+                return None
 
-            # print("world_pos: ", world_pos)
-            # print("face_verts: ", face_verts[0], face_verts[1], face_verts[2])
-            # print("uv_verts: ", uv_verts[0], uv_verts[1], uv_verts[2])
-
-            # point, tri_a1, tri_a2, tri_a3, tri_b1, tri_b2, tri_b3
-            uv_co = mathutils.geometry.barycentric_transform(
-                world_pos, face_verts[0], face_verts[1], face_verts[2], uv_verts[0], uv_verts[1], uv_verts[2]
-            )
+            # tolist gives plain floats, so the direction color never hands numpy scalars to the RNA color setter
+            v0, v1, v2 = tri_verts[face_index].tolist()
+            uv0, uv1, uv2 = tri_uvs[face_index].tolist()
+            uv_co = barycentric_uv(v0, v1, v2, uv0, uv1, uv2, obj_pos)
 
             return uv_co
 
-        global tri_obj
         obj = bpy.context.active_object
-        matrix = obj.matrix_world.copy()
         uv_co = None
         hit = None
-        hit_world = None
         if obj.type == 'MESH':
-            hit, normal, face_index = obj_ray_cast(context=context, area_pos=area_pos, obj=tri_obj, matrix=matrix)
+            hit, normal, face_index = obj_ray_cast(
+                context=context, area_pos=area_pos, bvh=tri_bvh, matrix_inv=tri_matrix_inv
+            )
             if hit is not None:
-                hit_world = matrix @ hit
-                # scene.cursor.location = hit_world
-                uv_co = pos_to_uv_co(
-                    obj=tri_obj, matrix_world=obj.matrix_world, world_pos=hit_world, face_index=face_index
-                )
+                # scene.cursor.location = tri_matrix @ hit
+                uv_co = pos_to_uv_co(obj_pos=hit, face_index=face_index)
 
         return uv_co, hit
 
-    # finally get the uv coordinates
+    # finally get the uv coordinates | the previous position was already traced last time, so reuse it if possible
     uv_pos, hit_world = line_trace_for_uv(context, area_pos)
-    uv_prev_pos, _ = line_trace_for_uv(context, area_prev_pos)
+    trace = (uv_pos, hit_world)
+    if prev_trace is not None and prev_trace[0] is not None:
+        uv_prev_pos = prev_trace[0]
+    else:
+        uv_prev_pos, _ = line_trace_for_uv(context, area_prev_pos)
 
     if uv_pos is None or uv_prev_pos is None:
-        return None, None
+        return None, None, trace
 
-    # convert to numpy array for further math
-    uv_pos = numpy.array([uv_pos[0], uv_pos[1]])
-    uv_prev_pos = numpy.array([uv_prev_pos[0], uv_prev_pos[1]])
+    # calculate the normalized direction vector as color
+    direction_color = dir_color2(uv_pos[0], uv_pos[1], uv_prev_pos[0], uv_prev_pos[1])
+    if direction_color is None:
+        return None, None, trace
 
-    # calculate direction vector and normalize it
-    uv_direction_vector = uv_pos - uv_prev_pos
-    norm_factor = numpy.linalg.norm(uv_direction_vector)
-    if norm_factor == 0:
-        return None, None
+    # return [uv_pos[0], uv_pos[1], 0]
+    return direction_color, hit_world, trace
 
-    norm_uv_direction_vector = uv_direction_vector / norm_factor
 
-    # map the range to the color range, so 0.5 ist the middle
-    color_range_vector = (norm_uv_direction_vector + 1) * 0.5
-    direction_color = [color_range_vector[0], color_range_vector[1], 0]
+def line_trace_for_pos_pair(context, area_pos, area_prev_pos, prev_trace=None):
+    """trace area_pos and reuse prev_trace (the trace of the last call) for area_prev_pos, if possible"""
 
-    # return [uv_pos[0], uv_pos[1], 0]
-    return direction_color, hit_world
+    location, hit_world = line_trace_for_pos(context=context, area_pos=area_pos)
+    trace = (location, hit_world)
+    if prev_trace is not None and prev_trace[1] is not None:
+        prev_hit_world = prev_trace[1]
+    else:
+        _, prev_hit_world = line_trace_for_pos(context=context, area_pos=area_prev_pos)
 
+    return location, hit_world, prev_hit_world, trace
 
-def get_obj_space_direction_color(context, area_pos, area_prev_pos):
-    """get the normalized vector color from brush and previous location in object space"""
+
+def get_obj_space_direction_color(context, area_pos, area_prev_pos, prev_trace=None):
+    """get the normalized vector color from brush and previous location in object space
+    prev_trace is the returned trace of the last call"""
 
     # get world hit and previus
-    location, hit_world = line_trace_for_pos(context=context, area_pos=area_pos)
-    _, prev_hit_world = line_trace_for_pos(context=context, area_pos=area_prev_pos)
+    location, hit_world, prev_hit_world, trace = line_trace_for_pos_pair(
+        context, area_pos, area_prev_pos, prev_trace=prev_trace
+    )
 
     if hit_world is None or prev_hit_world is None:
-        return None, None
+        return None, None, trace
     else:
 
-        obj = bpy.context.scene.flowmap_object
-        if obj is None:
-            obj = bpy.context.active_object
-
-        matrix = obj.matrix_world.inverted().copy()
+        # the painted object is already inverted once per stroke, only a separate flowmap_object needs it here
+        obj = context.scene.flowmap_object
+        if obj is None or obj == context.active_object:
+            matrix = tri_matrix_inv
+        else:
+            matrix = obj.matrix_world.inverted()
         hit_obj = matrix @ hit_world
         prev_hit_obj = matrix @ prev_hit_world
 
-        # convert to numpy array for further math
-        obj_pos = numpy.array([hit_obj[0], hit_obj[1], hit_obj[2]])
-        obj_prev_pos = numpy.array([prev_hit_obj[0], prev_hit_obj[1], prev_hit_obj[2]])
+        # calculate the normalized direction vector as color
+        direction_color = dir_color3(*hit_obj, *prev_hit_obj)
+        if direction_color is None:
+            return None, None, trace
 
-        # calculate direction vector and normalize it
-        world_direction_vector = obj_pos - obj_prev_pos
-        norm_factor = numpy.linalg.norm(world_direction_vector)
-        if norm_factor == 0:
-            return None, None
+        return direction_color, location, trace
 
-        norm_world_direction_vector = world_direction_vector / norm_factor
 
-        # map the range to the color range, so 0.5 ist the middle
-        color_range_vector = (norm_world_direction_vector + 1) * 0.5
-        # color_range_vector = norm_world_direction_vector #debug original color
-        direction_color = [color_range_vector[0], color_range_vector[1], color_range_vector[2]]
-
-        return direction_color, location
-
-
-def get_world_space_direction_color(context, area_pos, area_prev_pos):
-    """get the normalized vector color from brush and previous location in world space"""
+def get_world_space_direction_color(context, area_pos, area_prev_pos, prev_trace=None):
+    """get the normalized vector color from brush and previous location in world space
+    prev_trace is the returned trace of the last call"""
 
     # get world hit and previus
-    location, hit_world = line_trace_for_pos(context=context, area_pos=area_pos)
-    _, prev_hit_world = line_trace_for_pos(context=context, area_pos=area_prev_pos)
+    location, hit_world, prev_hit_world, trace = line_trace_for_pos_pair(
+        context, area_pos, area_prev_pos, prev_trace=prev_trace
+    )
 
     if hit_world is None or prev_hit_world is None:
-        return None, None
+        return None, None, trace
     else:
-        # convert to numpy array for further math
-        world_pos = numpy.array([hit_world[0], hit_world[1], hit_world[2]])
-        world_prev_pos = numpy.array([prev_hit_world[0], prev_hit_world[1], prev_hit_world[2]])
-
-        # calculate direction vector and normalize it
-        world_direction_vector = world_pos - world_prev_pos
-        norm_factor = numpy.linalg.norm(world_direction_vector)
-        if norm_factor == 0:
-            return None, None
+        # calculate the normalized direction vector as color
+        direction_color = dir_color3(*hit_world, *prev_hit_world)
+        if direction_color is None:
+            return None, None, trace
+
+        return direction_color, location, trace
+
 
-        norm_world_direction_vector = world_direction_vector / norm_factor
+def make_stroke_entry(mouse_position, area_position, location, pressure, size, is_start):
+    """one element of the stroke list for the paint operators"""
 
-        # map the range to the color range, so 0.5 ist the middle
-        color_range_vector = (norm_world_direction_vector + 1) * 0.5
-        # color_range_vector = norm_world_direction_vector #debug original color
-        direction_color = [color_range_vector[0], color_range_vector[1], color_range_vector[2]]
+    area_mouse = (mouse_position[0] - area_position[0], mouse_position[1] - area_position[1])
 
-        return direction_color, location
+    return {
+        "name": "test",
+        "is_start": is_start,
+        "location": location,
+        "mouse": area_mouse,
+        "mouse_event": area_mouse,
+        "pen_flip": False,
+        "pressure": pressure,
+        "size": size,
+        "time": 1,
+        "x_tilt": 0,
+        "y_tilt": 0,
+    }
 
 
-def paint_a_dot(context, area_type, mouse_position, event, location=None):
-    """paint one dot | works 2D, as well as 3D and also for vertex paint"""
+def paint_dots(context, area_type, mouse_positions, event, area_position, paint_settings, location=None):
+    """paint all given dots as one stroke | works 2D, as well as 3D and also for vertex paint
+    area_position and paint_settings are looked up once per event by the modal and passed in"""
 
     global mode
 
     if context.area.type != area_type:
         return None
 
-    area_position_x = bpy.context.area.x
-    area_position_y = bpy.context.area.y
-
     # get the active brush
     if mode == 'VERTEX_PAINT':
-        brush = bpy.context.tool_settings.vertex_paint.brush
+        brush = context.tool_settings.vertex_paint.brush
     elif mode == '2D_PAINT' or mode == '3D_PAINT':
-        brush = bpy.context.tool_settings.image_paint.brush
+        brush = context.tool_settings.image_paint.brush
     else:
         return None
 
     # pressure and dynamic pen pressure
-    pressure = bpy.context.scene.tool_settings.unified_paint_settings.use_unified_strength
+    pressure = paint_settings.use_unified_strength
     if brush.use_pressure_strength is True:
         pressure = pressure * event.pressure
 
     # size and dynamic pen pressure size
-    size = bpy.context.scene.tool_settings.unified_paint_settings.size
+    size = paint_settings.size
     if brush.use_pressure_size is True:
         size = size * event.pressure
 
@@ -334,20 +443,10 @@ def paint_a_dot(context, area_type, mouse_position, event, location=None):
     else:
         loc = location
 
+    # one operator call for all dots, only the first one starts the stroke
     stroke = [
-        {
-            "name": "test",
-            "is_start": True,
-            "location": loc,
-            "mouse": (mouse_position[0] - area_position_x, mouse_position[1] - area_position_y),
-            "mouse_event": (mouse_position[0] - area_position_x, mouse_position[1] - area_position_y),
-            "pen_flip": False,
-            "pressure": pressure,
-            "size": size,
-            "time": 1,
-            "x_tilt": 0,
-            "y_tilt": 0,
-        }
+        make_stroke_entry(mouse_position, area_position, loc, pressure, size, is_start=(i == 0))
+        for i, mouse_position in enumerate(mouse_positions)
     ]
 
     if mode == '2D_PAINT' or mode == '3D_PAINT':
@@ -360,108 +459,153 @@ def paint_a_dot(context, area_type, mouse_position, event, location=None):
     return None
 
 
-def modal_paint_three_d(self, context, event):
-    """The internal of the modal 3D operators. Its used for 3D_PAINT and VERTEX_PAINT."""
+def draw_cursor_three_d():
+    """draw the brush circle in the 3D viewport | reads the position from circle_pos"""
 
-    context.area.tag_redraw()
+    brush_col = bpy.context.scene.tool_settings.unified_paint_settings.color
+    col = (brush_col[0], brush_col[1], brush_col[2], 1)
+    size = bpy.context.scene.tool_settings.unified_paint_settings.size
+
+    draw_circle_2d(circle_pos, col, size)
+
+
+def draw_cursor_two_d():
+    """draw the brush circle in the image editor | reads the position from circle_pos"""
+
+    brush_col = bpy.context.scene.tool_settings.unified_paint_settings.color
+    col = (brush_col[0], brush_col[1], 0, 1)
+    size = bpy.context.scene.tool_settings.unified_paint_settings.size * bpy.context.space_data.zoom[0]
+
+    draw_circle_2d(circle_pos, col, size)
+
+
+def redraw_cursor(context, space_type, draw, pos, size, brush_changed=False):
+    """move the brush circle | the draw handler is only added once and the area is only redrawn,
+    if the pixel position or drawn size changed or the modal just changed the brush color (brush_changed)"""
 
     global circle
     global circle_pos
+    global circle_size
+
+    if circle is None:
+        circle = space_type.draw_handler_add(draw, (), 'WINDOW', 'POST_PIXEL')
+    elif pos == circle_pos and size == circle_size and not brush_changed:
+        return None
+
+    circle_pos = pos
+    circle_size = size
+    context.area.tag_redraw()
+
+    return None
+
+
+def modal_paint_three_d(self, context, event):
+    """The internal of the modal 3D operators. Its used for 3D_PAINT and VERTEX_PAINT."""
+
+    global circle
     global pressing
 
     # this is necessary, to find out if left mouse is pressed down (so no other keypress ist taken into account to trigger painting)
     if event.type == 'LEFTMOUSE' and event.value == 'PRESS':
         # set first position of stroke
-        self.furthest_position = numpy.array([event.mouse_x, event.mouse_y])
+        self.furthest_position = (event.mouse_x, event.mouse_y)
+        self.prev_trace = None
+        self.prev_pos_trace = None
+        update_matrix_cache(context.active_object)
         pressing = True
 
     if event.type == 'LEFTMOUSE' and event.value == 'RELEASE':
         pressing = False
 
     if event.type == 'MOUSEMOVE' or event.type == 'LEFTMOUSE':
-        # get mouse positions
-        mouse_position = numpy.array([event.mouse_x, event.mouse_y])
+        # look up the scene settings once per event
+        scene = context.scene
+        spacing = scene.flowmap_brush_spacing
 
-        # get area position
-        area_position_x = bpy.context.area.x
-        area_position_y = bpy.context.area.y
-
-        # get area mouse positions
-        area_pos = (mouse_position[0] - area_position_x, mouse_position[1] - area_position_y)
-        area_prev_pos = (self.mouse_prev_position[0] - area_position_x, self.mouse_prev_position[1] - area_position_y)
+        # get mouse positions
+        mouse_position = (event.mouse_x, event.mouse_y)
+        brush_changed = False
 
         # if mouse has traveled enough distance and mouse is pressed, get color, draw a dot
-        distance = numpy.linalg.norm(self.furthest_position - mouse_position)
-        if distance >= bpy.context.scene.flowmap_brush_spacing:
+        # (squared distances, so the many small moves below the spacing cost next to nothing)
+        dx = mouse_position[0] - self.furthest_position[0]
+        dy = mouse_position[1] - self.furthest_position[1]
+        distance_squared = dx * dx + dy * dy
+        if distance_squared >= spacing * spacing:
             # reset threshold
             self.furthest_position = mouse_position
 
+            paint_settings = scene.tool_settings.unified_paint_settings
+
+            # get area position
+            area = context.area
+            area_position_x = area.x
+            area_position_y = area.y
+
+            # get area mouse positions
+            area_pos = (mouse_position[0] - area_position_x, mouse_position[1] - area_position_y)
+            area_prev_pos = (
+                self.mouse_prev_position[0] - area_position_x, self.mouse_prev_position[1] - area_position_y
+            )
+
             # finding the direction vector, from UV Coordinates, from 3D location | object space | world space
             direction_color = None
             location = None
-            if bpy.context.scene.flowmap_space_type == "uv_space":
-                direction_color, location = get_uv_space_direction_color(context, area_pos, area_prev_pos)
-            elif bpy.context.scene.flowmap_space_type == "object_space":
-                direction_color, location = get_obj_space_direction_color(context, area_pos, area_prev_pos)
-            elif bpy.context.scene.flowmap_space_type == "world_space":
-                direction_color, location = get_world_space_direction_color(context, area_pos, area_prev_pos)
-
-            # set paint brush color, but check for nan first (fucked value, when direction didnt work)
-            if not direction_color is None:
-                if not any(numpy.isnan(val) for val in direction_color):
-                    bpy.context.scene.tool_settings.unified_paint_settings.color = direction_color
+            space_type = scene.flowmap_space_type
+            # the uv trace and the position trace are cached separately, so switching the space type is safe
+            if space_type == "uv_space":
+                direction_color, location, self.prev_trace = get_uv_space_direction_color(
+                    context, area_pos, area_prev_pos, prev_trace=self.prev_trace
+                )
+                self.prev_pos_trace = None
+            elif space_type == "object_space":
+                direction_color, location, self.prev_pos_trace = get_obj_space_direction_color(
+                    context, area_pos, area_prev_pos, prev_trace=self.prev_pos_trace
+                )
+                self.prev_trace = None
+            elif space_type == "world_space":
+                direction_color, location, self.prev_pos_trace = get_world_space_direction_color(
+                    context, area_pos, area_prev_pos, prev_trace=self.prev_pos_trace
+                )
+                self.prev_trace = None
+
+            # set paint brush color | no nan check needed, a zero length direction already returns None
+            if direction_color is not None:
+                paint_settings.color = direction_color
+                brush_changed = True
 
             if pressing:
                 # paint the actual dots with the selected brush spacing
                 # if mouse moved more than double of the brush_spacing -> draw substeps
-                substeps_float = distance / bpy.context.scene.flowmap_brush_spacing
+                distance = math.sqrt(distance_squared)
+                substeps_float = distance / spacing
                 substeps_int = int(substeps_float)
-                if distance > 2 * bpy.context.scene.flowmap_brush_spacing:
-                    # substep_count = substeps_int
-                    substep_count = substeps_int
-                    while substep_count > 0:
-                        # lerp_mix = 1 / (substeps_int + 1) * substep_count
-                        lerp_mix = 1 / (substeps_int) * substep_count
-                        lerp_paint_position = numpy.array(
-                            [
-                                lerp(lerp_mix, self.mouse_prev_position[0], mouse_position[0]),
-                                lerp(lerp_mix, self.mouse_prev_position[1], mouse_position[1])
-                            ]
-                        )
-                        paint_a_dot(
-                            context,
-                            area_type='VIEW_3D',
-                            mouse_position=lerp_paint_position,
-                            event=event,
-                            location=location
-                        )
-                        substep_count = substep_count - 1
-
+                if distance > 2 * spacing:
+                    paint_positions = substep_positions(self.mouse_prev_position, mouse_position, substeps_int)
                 else:
-                    paint_a_dot(
-                        context, area_type='VIEW_3D', mouse_position=mouse_position, event=event, location=location
-                    )
+                    paint_positions = [mouse_position]
+
+                paint_dots(
+                    context,
+                    area_type='VIEW_3D',
+                    mouse_positions=paint_positions,
+                    event=event,
+                    area_position=(area_position_x, area_position_y),
+                    paint_settings=paint_settings,
+                    location=location
+                )
 
             self.mouse_prev_position = mouse_position
 
-        # remove circle
-        if circle:
-            bpy.types.SpaceView3D.draw_handler_remove(circle, 'WINDOW')
-            circle = None
-
-        circle_pos = (event.mouse_region_x, event.mouse_region_y)
-
-        # draw circle
-        def draw():
-            global circle_pos
-            pos = circle_pos
-            brush_col = bpy.context.scene.tool_settings.unified_paint_settings.color
-            col = (brush_col[0], brush_col[1], brush_col[2], 1)
-            size = bpy.context.scene.tool_settings.unified_paint_settings.size
-
-            draw_circle_2d(pos, col, size)
-
-        circle = bpy.types.SpaceView3D.draw_handler_add(draw, (), 'WINDOW', 'POST_PIXEL')
+        # move circle
+        redraw_cursor(
+            context,
+            bpy.types.SpaceView3D,
+            draw_cursor_three_d,
+            (event.mouse_region_x, event.mouse_region_y),
+            scene.tool_settings.unified_paint_settings.size,
+            brush_changed=brush_changed
+        )
 
         return {'RUNNING_MODAL'}
 
@@ -474,9 +618,13 @@ def modal_paint_three_d(self, context, event):
             context.area.tag_redraw()
             circle = None
         context.area.tag_redraw()
-        remove_temp_obj()
+        remove_paint_cache()
         return {'FINISHED'}
 
+    # passed through keys (like the [ ] size hotkeys) can change the circle without a mouse move
+    if event.value == 'PRESS':
+        context.area.tag_redraw()
+
     return {'PASS_THROUGH'}
 
 
@@ -497,99 +645,86 @@ class FLOWMAP_OT_FLOW_MAP_PAINT_2D(bpy.types.Operator):
     bl_idname = "flowmap.flow_map_paint_two_d"
     bl_label = "Flowmap 2D Paint Mode"
 
-    furthest_position = numpy.array([0, 0])
+    furthest_position = (0, 0)
     mouse_prev_position = (0, 0)
 
     def modal(self, context: bpy.types.Context, event: bpy.types.Event):
-        context.area.tag_redraw()
 
         global circle
-        global circle_pos
         global pressing
 
         # this is necessary, to find out if left mouse is pressed down (so no other keypress ist taken into account to trigger painting)
         if event.type == 'LEFTMOUSE' and event.value == 'PRESS':
             # set first position of stroke
-            self.furthest_position = numpy.array([event.mouse_x, event.mouse_y])
+            self.furthest_position = (event.mouse_x, event.mouse_y)
             pressing = True
 
         if event.type == 'LEFTMOUSE' and event.value == 'RELEASE':
             pressing = False
 
         if event.type == 'MOUSEMOVE' or event.type == 'LEFTMOUSE':
+            # look up the scene settings once per event
+            scene = context.scene
+            spacing = scene.flowmap_brush_spacing
+
             # get mouse positions
-            mouse_position = numpy.array([event.mouse_x, event.mouse_y])
+            mouse_position = (event.mouse_x, event.mouse_y)
+            brush_changed = False
 
             # if mouse has traveled enough distance and mouse is pressed, draw a dot
-            distance = numpy.linalg.norm(self.furthest_position - mouse_position)
-            if distance >= bpy.context.scene.flowmap_brush_spacing:
+            # (squared distances, so the many small moves below the spacing cost next to nothing)
+            dx = mouse_position[0] - self.furthest_position[0]
+            dy = mouse_position[1] - self.furthest_position[1]
+            distance_squared = dx * dx + dy * dy
+            if distance_squared >= spacing * spacing:
                 # reset threshold
                 self.furthest_position = mouse_position
 
-                # calculate direction vector and normalize it
-                mouse_direction_vector = mouse_position - self.mouse_prev_position
-                norm_factor = numpy.linalg.norm(mouse_direction_vector)
-                if norm_factor == 0:
-                    norm_mouse_direction_vector = numpy.array([0, 0])
-                else:
-                    norm_mouse_direction_vector = mouse_direction_vector / norm_factor
+                paint_settings = scene.tool_settings.unified_paint_settings
+                area_position = (context.area.x, context.area.y)
 
-                # map the range to the color range, so 0.5 ist the middle
-                color_range_vector = (norm_mouse_direction_vector + 1) * 0.5
-                direction_color = [color_range_vector[0], color_range_vector[1], 0]
+                # calculate the normalized direction vector as color
+                direction_color = dir_color2(
+                    mouse_position[0], mouse_position[1], self.mouse_prev_position[0], self.mouse_prev_position[1]
+                )
+                if direction_color is None:
+                    direction_color = (0.5, 0.5, 0.0)
 
-                # set paint brush color, but check for nan first (fucked value, when direction didnt work)
-                if any(numpy.isnan(val) for val in direction_color):
-                    pass
-                else:
-                    bpy.context.scene.tool_settings.unified_paint_settings.color = direction_color
+                # set paint brush color | no nan check needed, a zero length direction is replaced above
+                paint_settings.color = direction_color
+                brush_changed = True
 
                 if pressing:
                     # paint the actual dots with the selected brush spacing
                     # if mouse moved more than double of the brush_spacing -> draw substeps
-                    substeps_float = distance / bpy.context.scene.flowmap_brush_spacing
+                    distance = math.sqrt(distance_squared)
+                    substeps_float = distance / spacing
                     substeps_int = int(substeps_float)
-                    if distance > 2 * bpy.context.scene.flowmap_brush_spacing:
-                        # substep_count = substeps_int
-                        substep_count = substeps_int
-                        while substep_count > 0:
-                            # lerp_mix = 1 / (substeps_int + 1) * substep_count
-                            lerp_mix = 1 / (substeps_int) * substep_count
-                            lerp_paint_position = numpy.array(
-                                [
-                                    lerp(lerp_mix, self.mouse_prev_position[0], mouse_position[0]),
-                                    lerp(lerp_mix, self.mouse_prev_position[1], mouse_position[1])
-                                ]
-                            )
-                            paint_a_dot(
-                                context, area_type='IMAGE_EDITOR', mouse_position=lerp_paint_position, event=event
-                            )
-                            substep_count = substep_count - 1
-
+                    if distance > 2 * spacing:
+                        paint_positions = substep_positions(self.mouse_prev_position, mouse_position, substeps_int)
                     else:
-                        paint_a_dot(context, area_type='IMAGE_EDITOR', mouse_position=mouse_position, event=event)
+                        paint_positions = [mouse_position]
+
+                    paint_dots(
+                        context,
+                        area_type='IMAGE_EDITOR',
+                        mouse_positions=paint_positions,
+                        event=event,
+                        area_position=area_position,
+                        paint_settings=paint_settings
+                    )
 
                 self.mouse_prev_position = mouse_position
 
-            # remove circle
-            if circle:
-                bpy.types.SpaceImageEditor.draw_handler_remove(circle, 'WINDOW')
-                circle = None
-
-            circle_pos = (event.mouse_region_x, event.mouse_region_y)
-
-            # draw circle
-            def draw():
-                global circle_pos
-                pos = circle_pos
-                brush_col = bpy.context.scene.tool_settings.unified_paint_settings.color
-                col = (brush_col[0], brush_col[1], 0, 1)
-
-                size = bpy.context.scene.tool_settings.unified_paint_settings.size * bpy.context.space_data.zoom[0]
-
-                draw_circle_2d(pos, col, size)
-
-            circle = bpy.types.SpaceImageEditor.draw_handler_add(draw, (), 'WINDOW', 'POST_PIXEL')
+            # move circle
+            redraw_cursor(
+                context,
+                bpy.types.SpaceImageEditor,
+                draw_cursor_two_d,
+                (event.mouse_region_x, event.mouse_region_y),
+                scene.tool_settings.unified_paint_settings.size * context.space_data.zoom[0],
+                brush_changed=brush_changed
+            )
 
             return {'RUNNING_MODAL'}
 
@@ -604,6 +739,10 @@ class FLOWMAP_OT_FLOW_MAP_PAINT_2D(bpy.types.Operator):
 
             return {'FINISHED'}
 
+        # passed through keys (like the [ ] size hotkeys) can change the circle without a mouse move
+        if event.value == 'PRESS':
+            context.area.tag_redraw()
+
         # return {'RUNNING_MODAL'}
         return {'PASS_THROUGH'}
 
@@ -626,8 +765,10 @@ class FLOWMAP_OT_FLOW_MAP_PAINT_3D(bpy.types.Operator):
     bl_idname = "flowmap.flow_map_paint_three_d"
     bl_label = "Flowmap 3D Paint Mode"
 
-    furthest_position = numpy.array([0, 0])
+    furthest_position = (0, 0)
     mouse_prev_position = (0, 0)
+    prev_trace = None
+    prev_pos_trace = None
 
     def modal(self, context=bpy.types.Context, event=bpy.types.Event):
 
@@ -641,8 +782,7 @@ class FLOWMAP_OT_FLOW_MAP_PAINT_3D(bpy.types.Operator):
         bpy.context.scene.tool_settings.unified_paint_settings.use_unified_color = True
         bpy.context.scene.tool_settings.unified_paint_settings.use_unified_strength = True
         bpy.context.scene.tool_settings.unified_paint_settings.use_unified_size = True
-        global tri_obj
-        tri_obj = triangulate_object(obj=bpy.context.active_object)
+        triangulate_object(obj=bpy.context.active_object)
         global mode
         mode = '3D_PAINT'
         bpy.context.window.cursor_set('PAINT_CROSS')
@@ -655,8 +795,10 @@ class FLOWMAP_OT_FLOW_MAP_PAINT_VERTCOL(bpy.types.Operator):
     bl_idname = "flowmap.flow_map_paint_vcol"
     bl_label = "Flowmap Vertex Paint Mode"
 
-    furthest_position = numpy.array([0, 0])
+    furthest_position = (0, 0)
     mouse_prev_position = (0, 0)
+    prev_trace = None
+    prev_pos_trace = None
 
     def modal(self, context=bpy.types.Context, event=bpy.types.Event):
         ret = modal_paint_three_d(self=self, context=context, event=event)
@@ -669,8 +811,7 @@ class FLOWMAP_OT_FLOW_MAP_PAINT_VERTCOL(bpy.types.Operator):
         bpy.context.scene.tool_settings.unified_paint_settings.use_unified_color = True
         bpy.context.scene.tool_settings.unified_paint_settings.use_unified_strength = True
         bpy.context.scene.tool_settings.unified_paint_settings.use_unified_size = True
-        global tri_obj
-        tri_obj = triangulate_object(obj=bpy.context.active_object)
+        triangulate_object(obj=bpy.context.active_object)
         global mode
         mode = 'VERTEX_PAINT'
         bpy.context.window.cursor_set('PAINT_CROSS')